@@ -1,14 +1,92 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
+from contextlib import asynccontextmanager
+from collections import defaultdict
+import asyncio
+import logging
+import numpy as np
+import orjson
+import os
+import sys
+import tempfile
 import uuid
 
+# Numba's on-disk JIT cache must be writeable; the deployed app directory may not be
+os.environ.setdefault("NUMBA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "numba-cache"))
+from numba import njit
+
+TELEMETRY_MAX_BATCH_SIZE = 128
+TELEMETRY_MAX_DELAY_SECONDS = 0.05
+TELEMETRY_MAX_QUEUED_EVENTS = 8192
+
+logger = logging.getLogger(__name__)
+telemetry_queue: Optional[asyncio.Queue] = None
+
+async def collect_telemetry_batch(queue: asyncio.Queue, max_batch_size: int, max_delay: float) -> list:
+    """Wait for one event, then gather more until the batch is full, max_delay has passed or shutdown is signalled"""
+    batch = [await queue.get()]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_delay
+    
+    while len(batch) < max_batch_size and batch[-1] is not None:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    
+    return batch
+
+def write_telemetry(batch: list):
+    sys.stdout.write("".join(f"Telemetry event: {event_data}\n" for event_data in batch))
+    sys.stdout.flush()
+
+async def flush_telemetry(queue: asyncio.Queue):
+    """Write queued telemetry events in batches until a None sentinel is received.
+    
+    A batch that cannot be written (e.g. stdout is a closed pipe) is dropped and
+    logged; the flusher keeps running so the queue keeps draining.
+    """
+    while True:
+        batch = await collect_telemetry_batch(queue, TELEMETRY_MAX_BATCH_SIZE, TELEMETRY_MAX_DELAY_SECONDS)
+        shutting_down = batch[-1] is None
+        if shutting_down:
+            batch.pop()
+        
+        if batch:
+            try:
+                write_telemetry(batch)
+            except Exception:
+                logger.exception("Dropped %d telemetry events", len(batch))
+        
+        if shutting_down:
+            return
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global telemetry_queue
+    
+    warm_up_kernels()
+    
+    telemetry_queue = asyncio.Queue(maxsize=TELEMETRY_MAX_QUEUED_EVENTS)
+    flusher = asyncio.create_task(flush_telemetry(telemetry_queue))
+    yield
+    
+    await telemetry_queue.put(None)
+    await flusher
+
 app = FastAPI(
     title="SQL Server Licensing Training API",
     description="API for SQL Server licensing training and cost calculation",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Disable CORS. Do not remove this for full-stack development.
@@ -23,12 +101,37 @@ app.add_middleware(
 topics_db = []
 scenarios_db = []
 quizzes_db = []
+topics_by_id = {}
+scenarios_by_id = {}
+quizzes_by_id = {}
+# Content is static after initialization, so responses are serialized once and served as raw bytes
+topic_json_by_id = {}
+scenario_json_by_id = {}
+quiz_json_by_id = {}
+scenarios_json = b""
+# Per-quiz correct answers as int8 arrays, for vectorized grading
+quiz_answer_keys = {}
 pricing_db = [
     {"id": "std-core", "edition": "Standard", "license_type": "PerCore", "price_per_unit": 3586},
     {"id": "ent-core", "edition": "Enterprise", "license_type": "PerCore", "price_per_unit": 14256},
     {"id": "std-cal", "edition": "Standard", "license_type": "ServerCAL", "server_price": 931, "cal_price": 209},
     {"id": "ent-cal", "edition": "Enterprise", "license_type": "ServerCAL", "server_price": 14256, "cal_price": 209}
 ]
+PRICING = {(p["edition"], p["license_type"]): p for p in pricing_db}
+
+SA_RATE = 0.25  # Software Assurance, as a fraction of license cost
+SA_LICENSE_NOTE = f"Software Assurance included ({SA_RATE:.0%} of license cost)"
+SA_TOTAL_NOTE = f"Software Assurance included ({SA_RATE:.0%} of total cost)"
+MIN_CORES = 4
+MAX_PRICE = max(p.get(field, 0) for p in pricing_db for field in ("price_per_unit", "server_price", "cal_price"))
+# The batch kernel prices in float64 while calculate_cost multiplies exact ints; up to this
+# count every count * price (+ server price) is an integer float64 holds exactly, so both agree
+BATCH_MAX_COUNT = (2**53 - MAX_PRICE) // MAX_PRICE
+BATCH_COUNT_RANGE = range(-BATCH_MAX_COUNT, BATCH_MAX_COUNT + 1)
+WORKLOAD_NOTES = {
+    "AzureVM": "Consider Azure Hybrid Benefit for potential cost savings",
+    "AzureSQLMI": "Azure SQL Managed Instance uses vCore-based pricing",
+}
 
 class CostModelRequest(BaseModel):
     workload_type: str  # OnPrem, AzureVM, AzureSQLMI
@@ -85,74 +188,151 @@ class QuizResult(BaseModel):
     total_questions: int
     detailed_feedback: List[str]
 
+HEALTHZ_BODY = b'{"status":"ok"}'
+
 @app.get("/healthz")
 async def healthz():
-    return {"status": "ok"}
+    return Response(content=HEALTHZ_BODY, media_type="application/json")
 
-@app.post("/api/v1/cost-model", response_model=CostModelResponse)
-async def calculate_cost(request: CostModelRequest):
-    try:
-        pricing = None
-        for p in pricing_db:
-            if p["edition"] == request.edition and p["license_type"] == request.license_model:
-                pricing = p
-                break
+def cost_model_notes(request: CostModelRequest, pricing: dict) -> List[str]:
+    notes = []
+    
+    if request.license_model == "PerCore":
+        if request.include_sa:
+            notes.append(SA_LICENSE_NOTE)
+        notes.append(f"Minimum {MIN_CORES} cores enforced (requested: {request.core_count}, billed: {max(request.core_count, MIN_CORES)})")
+    elif request.license_model == "ServerCAL":
+        if request.include_sa:
+            notes.append(SA_TOTAL_NOTE)
+        cal_cost = request.user_count * pricing["cal_price"]
+        notes.append(f"Server license: ${pricing['server_price']:,.2f}, CAL licenses: {request.user_count} × ${pricing['cal_price']} = ${cal_cost:,.2f}")
+    
+    workload_note = WORKLOAD_NOTES.get(request.workload_type)
+    if workload_note:
+        notes.append(workload_note)
+    
+    return notes
+
+@njit(cache=True)
+def cost_kernel(core_counts, user_counts, per_core_prices, server_prices, cal_prices, include_sa, license_is_percore, term_years):
+    """Vectorized form of the calculate_cost arithmetic; cost per user is NaN where there is no user count"""
+    n = core_counts.shape[0]
+    totals = np.empty(n, dtype=np.float64)
+    annuals = np.empty(n, dtype=np.float64)
+    costs_per_user = np.empty(n, dtype=np.float64)
+    
+    for i in range(n):
+        if license_is_percore[i]:
+            total = max(core_counts[i], MIN_CORES) * per_core_prices[i]
+        else:
+            total = server_prices[i] + user_counts[i] * cal_prices[i]
         
-        if not pricing:
-            raise HTTPException(status_code=400, detail="Invalid edition or license model")
+        if include_sa[i]:
+            total += total * SA_RATE
         
-        total_cost = 0
-        notes = []
+        totals[i] = total
+        annuals[i] = total / term_years[i]
+        costs_per_user[i] = total / user_counts[i] if user_counts[i] > 0 else np.nan
+    
+    return totals, annuals, costs_per_user
+
+def warm_up_kernels():
+    """Compile every JIT kernel with the argument types the endpoints pass, before the first request needs it"""
+    cost_kernel(
+        np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64),
+        np.zeros(1, dtype=np.float64), np.zeros(1, dtype=np.float64), np.zeros(1, dtype=np.float64),
+        np.zeros(1, dtype=np.bool_), np.zeros(1, dtype=np.bool_), np.ones(1, dtype=np.int64)
+    )
+
+@app.post("/api/v1/cost-model", response_model=CostModelResponse)
+async def calculate_cost(request: CostModelRequest):
+    pricing = PRICING.get((request.edition, request.license_model))
+    if not pricing:
+        raise HTTPException(status_code=400, detail="Invalid edition or license model")
+    
+    if request.term_years < 1:
+        raise HTTPException(status_code=400, detail="Term must be at least one year")
+    
+    total_cost = 0
+    
+    if request.license_model == "PerCore":
+        min_cores = max(request.core_count, MIN_CORES)
+        total_cost = min_cores * pricing["price_per_unit"]
         
-        if request.license_model == "PerCore":
-            min_cores = max(request.core_count, 4)  # Minimum 4 cores
-            core_cost = min_cores * pricing["price_per_unit"]
-            
-            if request.include_sa:
-                sa_cost = core_cost * 0.25  # 25% Software Assurance
-                total_cost = core_cost + sa_cost
-                notes.append(f"Software Assurance included (25% of license cost)")
-            else:
-                total_cost = core_cost
-            
-            notes.append(f"Minimum 4 cores enforced (requested: {request.core_count}, billed: {min_cores})")
-            
-        elif request.license_model == "ServerCAL":
-            if not request.user_count:
-                raise HTTPException(status_code=400, detail="User count required for Server+CAL licensing")
-            
-            server_cost = pricing["server_price"]
-            cal_cost = request.user_count * pricing["cal_price"]
-            total_cost = server_cost + cal_cost
-            
-            if request.include_sa:
-                sa_cost = total_cost * 0.25
-                total_cost += sa_cost
-                notes.append(f"Software Assurance included (25% of total cost)")
-            
-            notes.append(f"Server license: ${server_cost:,.2f}, CAL licenses: {request.user_count} × ${pricing['cal_price']} = ${cal_cost:,.2f}")
+        if request.include_sa:
+            total_cost += total_cost * SA_RATE
         
-        if request.workload_type == "AzureVM":
-            notes.append("Consider Azure Hybrid Benefit for potential cost savings")
-        elif request.workload_type == "AzureSQLMI":
-            notes.append("Azure SQL Managed Instance uses vCore-based pricing")
+    elif request.license_model == "ServerCAL":
+        if not request.user_count:
+            raise HTTPException(status_code=400, detail="User count required for Server+CAL licensing")
         
-        annual_cost = total_cost / request.term_years
-        annual_breakdown = [annual_cost] * request.term_years
+        total_cost = pricing["server_price"] + request.user_count * pricing["cal_price"]
         
-        cost_per_user = None
-        if request.user_count and request.user_count > 0:
-            cost_per_user = total_cost / request.user_count
+        if request.include_sa:
+            total_cost += total_cost * SA_RATE
+    
+    annual_cost = total_cost / request.term_years
+    annual_breakdown = [annual_cost] * request.term_years
+    
+    cost_per_user = None
+    if request.user_count and request.user_count > 0:
+        cost_per_user = total_cost / request.user_count
+    
+    return CostModelResponse(
+        total_cost=total_cost,
+        annual_breakdown=annual_breakdown,
+        cost_per_user=cost_per_user,
+        notes="; ".join(cost_model_notes(request, pricing))
+    )
+
+@app.post("/api/v1/cost-model/batch", response_model=List[CostModelResponse])
+async def calculate_cost_batch(requests: List[CostModelRequest]):
+    """Cost out many configurations in one call, e.g. for scenario sweeps and what-if grids"""
+    n = len(requests)
+    core_counts = np.zeros(n, dtype=np.int64)
+    user_counts = np.zeros(n, dtype=np.int64)
+    per_core_prices = np.zeros(n, dtype=np.float64)
+    server_prices = np.zeros(n, dtype=np.float64)
+    cal_prices = np.zeros(n, dtype=np.float64)
+    include_sa = np.zeros(n, dtype=np.bool_)
+    license_is_percore = np.zeros(n, dtype=np.bool_)
+    term_years = np.zeros(n, dtype=np.int64)
+    pricings = []
+    
+    for i, request in enumerate(requests):
+        pricing = PRICING.get((request.edition, request.license_model))
+        if not pricing:
+            raise HTTPException(status_code=400, detail=f"Invalid edition or license model (item {i})")
+        if request.license_model == "ServerCAL" and not request.user_count:
+            raise HTTPException(status_code=400, detail=f"User count required for Server+CAL licensing (item {i})")
+        if request.term_years < 1:
+            raise HTTPException(status_code=400, detail=f"Term must be at least one year (item {i})")
+        if not all(count in BATCH_COUNT_RANGE for count in (request.core_count, request.user_count or 0, request.term_years)):
+            raise HTTPException(status_code=400, detail=f"Core count, user count and term must be within ±{BATCH_MAX_COUNT} (item {i})")
         
-        return CostModelResponse(
-            total_cost=total_cost,
-            annual_breakdown=annual_breakdown,
-            cost_per_user=cost_per_user,
-            notes="; ".join(notes)
+        core_counts[i] = request.core_count
+        user_counts[i] = request.user_count or 0
+        per_core_prices[i] = pricing.get("price_per_unit", 0)
+        server_prices[i] = pricing.get("server_price", 0)
+        cal_prices[i] = pricing.get("cal_price", 0)
+        include_sa[i] = request.include_sa
+        license_is_percore[i] = request.license_model == "PerCore"
+        term_years[i] = request.term_years
+        pricings.append(pricing)
+    
+    totals, annuals, costs_per_user = cost_kernel(
+        core_counts, user_counts, per_core_prices, server_prices, cal_prices, include_sa, license_is_percore, term_years
+    )
+    
+    return [
+        CostModelResponse(
+            total_cost=totals[i],
+            annual_breakdown=[annuals[i]] * request.term_years,
+            cost_per_user=None if np.isnan(costs_per_user[i]) else costs_per_user[i],
+            notes="; ".join(cost_model_notes(request, pricings[i]))
         )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        for i, request in enumerate(requests)
+    ]
 
 @app.get("/api/v1/content/topics")
 async def get_topics(search: Optional[str] = None, page: int = 1, page_size: int = 20):
@@ -172,32 +352,35 @@ async def get_topics(search: Optional[str] = None, page: int = 1, page_size: int
 
 @app.get("/api/v1/content/topics/{topic_id}")
 async def get_topic(topic_id: str):
-    topic = next((t for t in topics_db if t["id"] == topic_id), None)
-    if not topic:
+    topic_json = topic_json_by_id.get(topic_id)
+    if topic_json is None:
         raise HTTPException(status_code=404, detail="Topic not found")
-    return topic
+    return Response(content=topic_json, media_type="application/json")
 
 @app.get("/api/v1/scenarios")
 async def get_scenarios():
-    return {"scenarios": scenarios_db}
+    return Response(content=scenarios_json, media_type="application/json")
 
 @app.get("/api/v1/scenarios/{scenario_id}")
 async def get_scenario(scenario_id: str):
-    scenario = next((s for s in scenarios_db if s["id"] == scenario_id), None)
-    if not scenario:
+    scenario_json = scenario_json_by_id.get(scenario_id)
+    if scenario_json is None:
         raise HTTPException(status_code=404, detail="Scenario not found")
-    return scenario
+    return Response(content=scenario_json, media_type="application/json")
 
 @app.get("/api/v1/quiz/{quiz_id}")
 async def get_quiz(quiz_id: str):
-    quiz = next((q for q in quizzes_db if q["id"] == quiz_id), None)
-    if not quiz:
+    quiz_json = quiz_json_by_id.get(quiz_id)
+    if quiz_json is None:
         raise HTTPException(status_code=404, detail="Quiz not found")
-    return quiz
+    return Response(content=quiz_json, media_type="application/json")
+
+def question_feedback(index: int, is_correct: bool, explanation: str) -> str:
+    return f"Question {index+1}: {'Correct' if is_correct else 'Incorrect'}. {explanation}"
 
 @app.post("/api/v1/quiz/submit", response_model=QuizResult)
 async def submit_quiz(submission: QuizSubmission):
-    quiz = next((q for q in quizzes_db if q["id"] == submission.quiz_id), None)
+    quiz = quizzes_by_id.get(submission.quiz_id)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
@@ -212,8 +395,7 @@ async def submit_quiz(submission: QuizSubmission):
         if is_correct:
             correct_count += 1
         
-        feedback = f"Question {i+1}: {'Correct' if is_correct else 'Incorrect'}. {question['explanation']}"
-        detailed_feedback.append(feedback)
+        detailed_feedback.append(question_feedback(i, is_correct, question["explanation"]))
     
     score = (correct_count / len(quiz["questions"])) * 100
     
@@ -224,13 +406,54 @@ async def submit_quiz(submission: QuizSubmission):
         detailed_feedback=detailed_feedback
     )
 
+@app.post("/api/v1/quiz/submit-batch", response_model=List[QuizResult])
+async def submit_quiz_batch(submissions: List[QuizSubmission], include_feedback: bool = False):
+    """Grade many submissions at once, e.g. a whole class; per-question feedback is only built when requested"""
+    indices_by_quiz = defaultdict(list)
+    for i, submission in enumerate(submissions):
+        answer_key = quiz_answer_keys.get(submission.quiz_id)
+        if answer_key is None:
+            raise HTTPException(status_code=404, detail=f"Quiz not found (item {i})")
+        if len(submission.answers) != len(answer_key):
+            raise HTTPException(status_code=400, detail=f"Answer count doesn't match question count (item {i})")
+        indices_by_quiz[submission.quiz_id].append(i)
+    
+    results = [None] * len(submissions)
+    for quiz_id, indices in indices_by_quiz.items():
+        answer_key = quiz_answer_keys[quiz_id]
+        total_questions = len(answer_key)
+        is_correct = np.array([submissions[i].answers for i in indices]) == answer_key
+        correct_counts = is_correct.sum(axis=1)
+        
+        for row, i in enumerate(indices):
+            detailed_feedback = []
+            if include_feedback:
+                detailed_feedback = [
+                    question_feedback(q, bool(is_correct[row, q]), question["explanation"])
+                    for q, question in enumerate(quizzes_by_id[quiz_id]["questions"])
+                ]
+            
+            results[i] = QuizResult(
+                score=(int(correct_counts[row]) / total_questions) * 100,
+                correct_answers=int(correct_counts[row]),
+                total_questions=total_questions,
+                detailed_feedback=detailed_feedback
+            )
+    
+    return results
+
 @app.post("/api/v1/telemetry")
 async def log_telemetry(event_data: dict):
-    print(f"Telemetry event: {event_data}")
-    return {"status": "logged"}
+    if telemetry_queue is None:
+        raise HTTPException(status_code=503, detail="Telemetry is not running")
+    try:
+        telemetry_queue.put_nowait(event_data)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Telemetry queue is full")
+    return {"status": "queued"}
 
 def initialize_sample_data():
-    global topics_db, scenarios_db, quizzes_db
+    global topics_db, scenarios_db, quizzes_db, topics_by_id, scenarios_by_id, quizzes_by_id, quiz_answer_keys
     
     topics_db = [
         {
@@ -295,5 +518,23 @@ def initialize_sample_data():
             ]
         }
     ]
+    
+    topics_by_id = {t["id"]: t for t in topics_db}
+    scenarios_by_id = {s["id"]: s for s in scenarios_db}
+    quizzes_by_id = {q["id"]: q for q in quizzes_db}
+    quiz_answer_keys = {
+        q["id"]: np.array([question["correct_answer"] for question in q["questions"]], dtype=np.int8)
+        for q in quizzes_db
+    }
+    refresh_content_cache()
+
+def refresh_content_cache():
+    """Re-serialize cached content responses; call after any change to topics, scenarios or quizzes"""
+    global topic_json_by_id, scenario_json_by_id, quiz_json_by_id, scenarios_json
+    
+    topic_json_by_id = {tid: orjson.dumps(t) for tid, t in topics_by_id.items()}
+    scenario_json_by_id = {sid: orjson.dumps(s) for sid, s in scenarios_by_id.items()}
+    quiz_json_by_id = {qid: orjson.dumps(q) for qid, q in quizzes_by_id.items()}
+    scenarios_json = orjson.dumps({"scenarios": scenarios_db})
 
 initialize_sample_data()
@@ -0,0 +1,75 @@
+import itertools
+import random
+
+import pytest
+
+from app.main import BATCH_MAX_COUNT
+
+
+COST_CONFIGURATIONS = [
+    {
+        "workload_type": workload_type,
+        "edition": edition,
+        "license_model": license_model,
+        "core_count": core_count,
+        "user_count": user_count,
+        "include_sa": include_sa,
+        "term_years": term_years,
+    }
+    for workload_type, edition, license_model, core_count, user_count, include_sa, term_years in itertools.product(
+        ["OnPrem", "AzureVM", "AzureSQLMI"],
+        ["Standard", "Enterprise"],
+        ["PerCore", "ServerCAL"],
+        [-BATCH_MAX_COUNT, 1, 4, 16, 3_000_000_000, BATCH_MAX_COUNT],
+        [None, 25, 5_000_000_000, BATCH_MAX_COUNT],
+        [True, False],
+        [1, 3, 5],
+    )
+]
+
+
+def test_cost_batch_matches_single_endpoint(client):
+    expected = [client.post("/api/v1/cost-model", json=configuration) for configuration in COST_CONFIGURATIONS]
+    valid = [configuration for configuration, response in zip(COST_CONFIGURATIONS, expected) if response.status_code == 200]
+    assert valid
+
+    response = client.post("/api/v1/cost-model/batch", json=valid)
+
+    assert response.status_code == 200
+    assert response.json() == [r.json() for r in expected if r.status_code == 200]
+
+
+@pytest.mark.parametrize(
+    "invalid",
+    [
+        {"edition": "Developer"},
+        {"license_model": "ServerCAL", "user_count": None},
+        {"term_years": 0},
+        {"core_count": BATCH_MAX_COUNT + 1},
+        {"core_count": -BATCH_MAX_COUNT - 1},
+        {"license_model": "ServerCAL", "user_count": BATCH_MAX_COUNT + 1},
+        {"core_count": 2**70},
+    ],
+)
+def test_cost_batch_reports_invalid_item_index(client, invalid):
+    valid = COST_CONFIGURATIONS[0]
+
+    response = client.post("/api/v1/cost-model/batch", json=[valid, {**valid, **invalid}])
+
+    assert response.status_code == 400
+    assert response.json()["detail"].endswith("(item 1)")
+
+
+def test_cost_batch_matches_single_endpoint_for_random_counts(client):
+    rng = random.Random(0)
+    configurations = [
+        {
+            **rng.choice(COST_CONFIGURATIONS),
+            "core_count": rng.randint(-BATCH_MAX_COUNT, BATCH_MAX_COUNT),
+            "user_count": rng.randint(1, BATCH_MAX_COUNT),
+        }
+        for _ in range(500)
+    ]
+    expected = [client.post("/api/v1/cost-model", json=configuration).json() for configuration in configurations]
+
+    assert client.post("/api/v1/cost-model/batch", json=configurations).json() == expected
@@ -0,0 +1,33 @@
+import itertools
+
+from app import main
+
+
+def quiz_submissions():
+    for quiz_id, quiz in main.quizzes_by_id.items():
+        options = range(-1, max(len(question["options"]) for question in quiz["questions"]) + 1)
+        for answers in itertools.product(options, repeat=len(quiz["questions"])):
+            yield {"quiz_id": quiz_id, "answers": list(answers)}
+
+
+def test_quiz_batch_matches_single_submission(client):
+    submissions = list(quiz_submissions())
+    expected = [client.post("/api/v1/quiz/submit", json=submission).json() for submission in submissions]
+
+    with_feedback = client.post("/api/v1/quiz/submit-batch", params={"include_feedback": True}, json=submissions)
+    without_feedback = client.post("/api/v1/quiz/submit-batch", json=submissions)
+
+    assert with_feedback.json() == expected
+    assert without_feedback.json() == [{**result, "detailed_feedback": []} for result in expected]
+
+
+def test_quiz_batch_reports_invalid_item_index(client):
+    submission = next(quiz_submissions())
+
+    unknown_quiz = client.post("/api/v1/quiz/submit-batch", json=[submission, {**submission, "quiz_id": "missing"}])
+    wrong_length = client.post("/api/v1/quiz/submit-batch", json=[submission, {**submission, "answers": [0]}])
+
+    assert unknown_quiz.status_code == 404
+    assert unknown_quiz.json()["detail"].endswith("(item 1)")
+    assert wrong_length.status_code == 400
+    assert wrong_length.json()["detail"].endswith("(item 1)")
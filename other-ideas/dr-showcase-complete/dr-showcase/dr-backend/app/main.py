@@ -1,12 +1,16 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+from collections import deque
+import asyncio
+import itertools
+import orjson
 import random
-import time
 
-app = FastAPI(title="Disaster Recovery Management API", version="1.0.0")
+app = FastAPI(title="Disaster Recovery Management API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Disable CORS. Do not remove this for full-stack development.
 app.add_middleware(
@@ -47,9 +51,13 @@ backup_jobs = [
     BackupJob("backup_004", "primary", "failed")
 ]
 
-failover_history = []
+FAILOVER_HISTORY_MAX_EVENTS = 1000
+
+failover_history = deque(maxlen=FAILOVER_HISTORY_MAX_EVENTS)
 
 class SiteStatus(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     name: str
     location: str
     status: str
@@ -58,6 +66,8 @@ class SiteStatus(BaseModel):
     rto_minutes: int
 
 class BackupJobResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     job_id: str
     site: str
     status: str
@@ -65,38 +75,30 @@ class BackupJobResponse(BaseModel):
     size_gb: int
 
 class FailoverRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     from_site: str
     to_site: str
     reason: str
 
 class FailoverResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     success: bool
     message: str
     failover_time: datetime
     estimated_downtime_minutes: int
 
-@app.get("/")
-def read_root():
-    return {
-        "message": "Disaster Recovery Management API",
-        "version": "1.0.0",
-        "endpoints": [
-            "/sites/status",
-            "/backups/jobs",
-            "/failover/initiate",
-            "/failover/history",
-            "/health/check"
-        ]
-    }
+# Serialized /sites/status and /backups/jobs bodies; refresh after mutating dr_sites or backup_jobs
+SITE_LIST_ADAPTER = TypeAdapter(List[SiteStatus])
+BACKUP_JOB_LIST_ADAPTER = TypeAdapter(List[BackupJobResponse])
 
-@app.get("/healthz")
-async def healthz():
-    return {"status": "ok"}
+sites_json = b""
+backup_jobs_json = b""
 
-@app.get("/sites/status", response_model=List[SiteStatus])
-def get_sites_status():
-    """Get status of all DR sites"""
-    return [
+def refresh_sites_json():
+    global sites_json
+    sites_json = SITE_LIST_ADAPTER.dump_json([
         SiteStatus(
             name=site.name,
             location=site.location,
@@ -106,12 +108,11 @@ def get_sites_status():
             rto_minutes=site.rto_minutes
         )
         for site in dr_sites.values()
-    ]
+    ])
 
-@app.get("/backups/jobs", response_model=List[BackupJobResponse])
-def get_backup_jobs():
-    """Get all backup jobs"""
-    return [
+def refresh_backup_jobs_json():
+    global backup_jobs_json
+    backup_jobs_json = BACKUP_JOB_LIST_ADAPTER.dump_json([
         BackupJobResponse(
             job_id=job.job_id,
             site=job.site,
@@ -120,10 +121,45 @@ def get_backup_jobs():
             size_gb=job.size_gb
         )
         for job in backup_jobs
+    ])
+
+refresh_sites_json()
+refresh_backup_jobs_json()
+
+ROOT_BODY = orjson.dumps({
+    "message": "Disaster Recovery Management API",
+    "version": "1.0.0",
+    "endpoints": [
+        "/sites/status",
+        "/backups/jobs",
+        "/failover/initiate",
+        "/failover/history",
+        "/health/check"
     ]
+})
+
+@app.get("/")
+async def read_root():
+    return Response(content=ROOT_BODY, media_type="application/json")
+
+HEALTHZ_BODY = b'{"status":"ok"}'
+
+@app.get("/healthz")
+async def healthz():
+    return Response(content=HEALTHZ_BODY, media_type="application/json")
+
+@app.get("/sites/status", response_model=List[SiteStatus])
+async def get_sites_status():
+    """Get status of all DR sites"""
+    return Response(content=sites_json, media_type="application/json")
+
+@app.get("/backups/jobs", response_model=List[BackupJobResponse])
+async def get_backup_jobs():
+    """Get all backup jobs"""
+    return Response(content=backup_jobs_json, media_type="application/json")
 
 @app.post("/failover/initiate", response_model=FailoverResponse)
-def initiate_failover(request: FailoverRequest):
+async def initiate_failover(request: FailoverRequest):
     """Initiate failover between sites"""
     if request.from_site not in dr_sites or request.to_site not in dr_sites:
         raise HTTPException(status_code=400, detail="Invalid site specified")
@@ -133,16 +169,18 @@ def initiate_failover(request: FailoverRequest):
     else:
         estimated_downtime = random.randint(5, 15)
     
-    time.sleep(1)  # Simulate processing time
+    await asyncio.sleep(1)  # Simulate processing time
+    now = datetime.now()
     
     dr_sites[request.from_site].status = "failed"
     dr_sites[request.to_site].status = "active"
+    refresh_sites_json()
     
     failover_event = {
         "from_site": request.from_site,
         "to_site": request.to_site,
         "reason": request.reason,
-        "timestamp": datetime.now(),
+        "timestamp": now,
         "downtime_minutes": estimated_downtime
     }
     failover_history.append(failover_event)
@@ -150,17 +188,17 @@ def initiate_failover(request: FailoverRequest):
     return FailoverResponse(
         success=True,
         message=f"Failover from {request.from_site} to {request.to_site} completed successfully",
-        failover_time=datetime.now(),
+        failover_time=now,
         estimated_downtime_minutes=estimated_downtime
     )
 
 @app.get("/failover/history")
-def get_failover_history():
-    """Get failover history"""
-    return {"history": failover_history}
+async def get_failover_history(limit: int = 100):
+    """Get the most recent failover events, newest first"""
+    return ORJSONResponse({"history": list(itertools.islice(reversed(failover_history), max(limit, 0)))})
 
 @app.get("/health/check")
-def health_check():
+async def health_check():
     """Health check endpoint"""
     healthy_sites = sum(1 for site in dr_sites.values() if site.status in ["healthy", "active"])
     total_sites = len(dr_sites)
@@ -174,16 +212,18 @@ def health_check():
     }
 
 @app.post("/sites/{site_id}/restore")
-def restore_site(site_id: str):
+async def restore_site(site_id: str):
     """Restore a failed site"""
     if site_id not in dr_sites:
         raise HTTPException(status_code=404, detail="Site not found")
     
+    now = datetime.now()
     dr_sites[site_id].status = "healthy"
-    dr_sites[site_id].last_backup = datetime.now()
+    dr_sites[site_id].last_backup = now
+    refresh_sites_json()
     
     return {
         "success": True,
         "message": f"Site {site_id} restored successfully",
-        "timestamp": datetime.now()
+        "timestamp": now
     }
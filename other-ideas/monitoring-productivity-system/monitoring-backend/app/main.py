@@ -1,12 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
+from collections import Counter, defaultdict
+import heapq
+import numpy as np
 import random
 import uuid
 
-app = FastAPI(title="Productivity Monitoring System", version="1.0.0")
+app = FastAPI(title="Productivity Monitoring System", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Disable CORS. Do not remove this for full-stack development.
 app.add_middleware(
@@ -17,9 +21,36 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+METRIC_TYPES = [
+    "cpu_usage", "memory_usage", "disk_usage", "network_latency",
+    "application_response_time", "error_rate", "active_sessions",
+    "task_completion_rate", "focus_time", "meeting_duration"
+]
+metric_type_codes = {name: code for code, name in enumerate(METRIC_TYPES)}
+user_id_codes = {}
+KNOWN_USERS: set[str] = set()
+KNOWN_METRIC_TYPES: set[str] = set()
+PRIORITY_RANK = {"high": 3, "medium": 2, "low": 1}
+
 monitoring_data = []
+# Struct-of-arrays view of monitoring_data, row-aligned with it, used for filtering and aggregation
+metric_user_ids = np.empty(0, dtype=np.int32)
+metric_types = np.empty(0, dtype=np.int32)
+metric_values = np.empty(0, dtype=np.float32)
+metric_timestamps = np.empty(0, dtype=np.int64)
 alerts = []
 self_service_prompts = []
+alert_positions = {}
+prompts_by_id = {}
+# Inverted indexes from filter field value to the list positions of matching alerts/prompts;
+# positions rather than ids so matches resolve back in insertion order
+alert_positions_by_user: Dict[str, set] = {}
+alert_positions_by_severity: Dict[str, set] = {}
+alert_positions_by_resolved: Dict[bool, set] = {}
+prompt_positions_by_user: Dict[str, set] = {}
+prompt_positions_by_priority: Dict[str, set] = {}
+# PRIORITY_RANK of each prompt by list position; an internal sort key, kept out of the prompt records
+prompt_priority_ranks: List[int] = []
 
 class MonitoringMetric(BaseModel):
     user_id: str
@@ -49,22 +80,17 @@ class SelfServicePrompt(BaseModel):
     timestamp: datetime
 
 def initialize_sample_data():
-    global monitoring_data, alerts, self_service_prompts
+    global monitoring_data, alerts, self_service_prompts, alert_positions, prompts_by_id
     
     users = ["alice", "bob", "charlie", "diana", "eve"]
     current_time = datetime.now()
     
     for i in range(100):
         user = random.choice(users)
-        metric_types = [
-            "cpu_usage", "memory_usage", "disk_usage", "network_latency",
-            "application_response_time", "error_rate", "active_sessions",
-            "task_completion_rate", "focus_time", "meeting_duration"
-        ]
         
         monitoring_data.append({
             "user_id": user,
-            "metric_type": random.choice(metric_types),
+            "metric_type": random.choice(METRIC_TYPES),
             "value": random.uniform(0, 100),
             "timestamp": current_time - timedelta(hours=random.randint(0, 72)),
             "metadata": {"source": "system_monitor", "environment": "production"}
@@ -164,105 +190,183 @@ def initialize_sample_data():
                 "priority": scenario["priority"],
                 "timestamp": current_time - timedelta(hours=random.randint(0, 12))
             })
+    
+    alert_positions = {a["id"]: i for i, a in enumerate(alerts)}
+    prompts_by_id = {p["id"]: p for p in self_service_prompts}
+    build_filter_indexes()
+    build_metric_arrays()
+
+def index_by(records: List[Dict], field: str) -> Dict:
+    index = defaultdict(set)
+    for position, record in enumerate(records):
+        index[record[field]].add(position)
+    return dict(index)
+
+def build_filter_indexes():
+    """Rebuild the alert and prompt inverted indexes from the current records"""
+    global alert_positions_by_user, alert_positions_by_severity, alert_positions_by_resolved
+    global prompt_positions_by_user, prompt_positions_by_priority, prompt_priority_ranks
+    
+    alert_positions_by_user = index_by(alerts, "user_id")
+    alert_positions_by_severity = index_by(alerts, "severity")
+    alert_positions_by_resolved = index_by(alerts, "is_resolved")
+    prompt_positions_by_user = index_by(self_service_prompts, "user_id")
+    prompt_positions_by_priority = index_by(self_service_prompts, "priority")
+    prompt_priority_ranks = [PRIORITY_RANK[p["priority"]] for p in self_service_prompts]
+
+def prompt_sort_key(position: int) -> tuple:
+    return prompt_priority_ranks[position], self_service_prompts[position]["timestamp"]
+
+def intersect_positions(position_sets: List[set]) -> List[int]:
+    """Intersect filter matches, smallest set first so the work is bounded by the most selective filter.
+    
+    The result is sorted so records come back in insertion order, which keeps
+    nlargest's tie order the same as for the unfiltered list.
+    """
+    position_sets = sorted(position_sets, key=len)
+    return sorted(position_sets[0].intersection(*position_sets[1:]))
+
+def to_epoch_ns(value: datetime) -> int:
+    return int(np.datetime64(value, "ns").astype(np.int64))
+
+def build_metric_arrays():
+    """Rebuild the struct-of-arrays metric columns from monitoring_data"""
+    global metric_user_ids, metric_types, metric_values, metric_timestamps
+    
+    for m in monitoring_data:
+        user_id_codes.setdefault(m["user_id"], len(user_id_codes))
+        KNOWN_USERS.add(m["user_id"])
+        KNOWN_METRIC_TYPES.add(m["metric_type"])
+    
+    metric_user_ids = np.fromiter((user_id_codes[m["user_id"]] for m in monitoring_data), dtype=np.int32, count=len(monitoring_data))
+    metric_types = np.fromiter((metric_type_codes[m["metric_type"]] for m in monitoring_data), dtype=np.int32, count=len(monitoring_data))
+    metric_values = np.fromiter((m["value"] for m in monitoring_data), dtype=np.float32, count=len(monitoring_data))
+    metric_timestamps = np.array([m["timestamp"] for m in monitoring_data], dtype="datetime64[ns]").astype(np.int64)
 
 initialize_sample_data()
 
+HEALTHZ_BODY = b'{"status":"ok"}'
+
 @app.get("/healthz")
 async def healthz():
-    return {"status": "ok"}
+    return Response(content=HEALTHZ_BODY, media_type="application/json")
 
 @app.get("/api/monitoring/metrics")
 async def get_monitoring_metrics(user_id: Optional[str] = None, metric_type: Optional[str] = None):
     """Get monitoring metrics, optionally filtered by user_id and metric_type"""
     filtered_data = monitoring_data
     
-    if user_id:
-        filtered_data = [m for m in filtered_data if m["user_id"] == user_id]
-    
-    if metric_type:
-        filtered_data = [m for m in filtered_data if m["metric_type"] == metric_type]
+    if user_id or metric_type:
+        mask = np.ones(len(monitoring_data), dtype=bool)
+        if user_id:
+            mask &= metric_user_ids == user_id_codes.get(user_id, -1)
+        if metric_type:
+            mask &= metric_types == metric_type_codes.get(metric_type, -1)
+        filtered_data = [monitoring_data[i] for i in np.flatnonzero(mask)]
     
-    return {
+    return ORJSONResponse({
         "metrics": filtered_data,
         "total_count": len(filtered_data),
-        "users": list(set([m["user_id"] for m in monitoring_data])),
-        "metric_types": list(set([m["metric_type"] for m in monitoring_data]))
-    }
+        "users": list(KNOWN_USERS),
+        "metric_types": list(KNOWN_METRIC_TYPES)
+    })
 
 @app.get("/api/alerts")
-async def get_alerts(user_id: Optional[str] = None, severity: Optional[str] = None, resolved: Optional[bool] = None):
-    """Get alerts, optionally filtered by user_id, severity, and resolution status"""
+async def get_alerts(user_id: Optional[str] = None, severity: Optional[str] = None, resolved: Optional[bool] = None, page: int = 1, page_size: int = 20):
+    """Get a page of alerts, newest first, optionally filtered by user_id, severity, and resolution status"""
     filtered_alerts = alerts
     
+    position_sets = []
     if user_id:
-        filtered_alerts = [a for a in filtered_alerts if a["user_id"] == user_id]
-    
+        position_sets.append(alert_positions_by_user.get(user_id, set()))
     if severity:
-        filtered_alerts = [a for a in filtered_alerts if a["severity"] == severity]
-    
+        position_sets.append(alert_positions_by_severity.get(severity, set()))
     if resolved is not None:
-        filtered_alerts = [a for a in filtered_alerts if a["is_resolved"] == resolved]
+        position_sets.append(alert_positions_by_resolved.get(resolved, set()))
     
-    filtered_alerts.sort(key=lambda x: x["timestamp"], reverse=True)
+    if position_sets:
+        filtered_alerts = [alerts[i] for i in intersect_positions(position_sets)]
     
-    return {
-        "alerts": filtered_alerts,
+    start_idx = (page - 1) * page_size
+    page_alerts = heapq.nlargest(start_idx + page_size, filtered_alerts, key=lambda x: x["timestamp"])[start_idx:]
+    
+    severity_counts = Counter()
+    unresolved = 0
+    for a in filtered_alerts:
+        severity_counts[a["severity"]] += 1
+        unresolved += not a["is_resolved"]
+    
+    return ORJSONResponse({
+        "alerts": page_alerts,
         "total_count": len(filtered_alerts),
+        "page": page,
+        "page_size": page_size,
         "summary": {
-            "high_severity": len([a for a in filtered_alerts if a["severity"] == "high"]),
-            "medium_severity": len([a for a in filtered_alerts if a["severity"] == "medium"]),
-            "low_severity": len([a for a in filtered_alerts if a["severity"] == "low"]),
-            "unresolved": len([a for a in filtered_alerts if not a["is_resolved"]])
+            "high_severity": severity_counts["high"],
+            "medium_severity": severity_counts["medium"],
+            "low_severity": severity_counts["low"],
+            "unresolved": unresolved
         }
-    }
+    })
 
 @app.get("/api/self-service-prompts")
-async def get_self_service_prompts(user_id: Optional[str] = None, priority: Optional[str] = None):
-    """Get self-service prompts, optionally filtered by user_id and priority"""
-    filtered_prompts = self_service_prompts
+async def get_self_service_prompts(user_id: Optional[str] = None, priority: Optional[str] = None, page: int = 1, page_size: int = 20):
+    """Get a page of self-service prompts, highest priority and newest first, optionally filtered by user_id and priority"""
+    positions = range(len(self_service_prompts))
     
+    position_sets = []
     if user_id:
-        filtered_prompts = [p for p in filtered_prompts if p["user_id"] == user_id]
-    
+        position_sets.append(prompt_positions_by_user.get(user_id, set()))
     if priority:
-        filtered_prompts = [p for p in filtered_prompts if p["priority"] == priority]
+        position_sets.append(prompt_positions_by_priority.get(priority, set()))
     
-    priority_order = {"high": 3, "medium": 2, "low": 1}
-    filtered_prompts.sort(key=lambda x: (priority_order.get(x["priority"], 0), x["timestamp"]), reverse=True)
+    if position_sets:
+        positions = intersect_positions(position_sets)
     
-    return {
-        "prompts": filtered_prompts,
-        "total_count": len(filtered_prompts),
+    start_idx = (page - 1) * page_size
+    page_positions = heapq.nlargest(start_idx + page_size, positions, key=prompt_sort_key)[start_idx:]
+    
+    priority_counts = Counter(self_service_prompts[i]["priority"] for i in positions)
+    
+    return ORJSONResponse({
+        "prompts": [self_service_prompts[i] for i in page_positions],
+        "total_count": len(positions),
+        "page": page,
+        "page_size": page_size,
         "summary": {
-            "high_priority": len([p for p in filtered_prompts if p["priority"] == "high"]),
-            "medium_priority": len([p for p in filtered_prompts if p["priority"] == "medium"]),
-            "low_priority": len([p for p in filtered_prompts if p["priority"] == "low"])
+            "high_priority": priority_counts["high"],
+            "medium_priority": priority_counts["medium"],
+            "low_priority": priority_counts["low"]
         }
-    }
+    })
 
 @app.post("/api/alerts/{alert_id}/resolve")
 async def resolve_alert(alert_id: str):
     """Mark an alert as resolved"""
-    for alert in alerts:
-        if alert["id"] == alert_id:
-            alert["is_resolved"] = True
-            return {"message": "Alert resolved successfully", "alert": alert}
+    position = alert_positions.get(alert_id)
+    if position is None:
+        return {"error": "Alert not found"}, 404
     
-    return {"error": "Alert not found"}, 404
+    alert = alerts[position]
+    if not alert["is_resolved"]:
+        alert["is_resolved"] = True
+        alert_positions_by_resolved.get(False, set()).discard(position)
+        alert_positions_by_resolved.setdefault(True, set()).add(position)
+    
+    return {"message": "Alert resolved successfully", "alert": alert}
 
 @app.post("/api/self-service-prompts/{prompt_id}/action")
 async def handle_prompt_action(prompt_id: str, action_type: str):
     """Handle action taken on a self-service prompt"""
-    for prompt in self_service_prompts:
-        if prompt["id"] == prompt_id:
-            return {
-                "message": f"Action '{action_type}' processed successfully",
-                "prompt_id": prompt_id,
-                "action_type": action_type,
-                "timestamp": datetime.now()
-            }
+    if prompt_id not in prompts_by_id:
+        return {"error": "Prompt not found"}, 404
     
-    return {"error": "Prompt not found"}, 404
+    return {
+        "message": f"Action '{action_type}' processed successfully",
+        "prompt_id": prompt_id,
+        "action_type": action_type,
+        "timestamp": datetime.now()
+    }
 
 @app.get("/api/dashboard/summary")
 async def get_dashboard_summary():
@@ -270,22 +374,26 @@ async def get_dashboard_summary():
     current_time = datetime.now()
     recent_threshold = current_time - timedelta(hours=24)
     
-    recent_metrics = [m for m in monitoring_data if m["timestamp"] > recent_threshold]
-    unresolved_alerts = [a for a in alerts if not a["is_resolved"]]
-    high_priority_prompts = [p for p in self_service_prompts if p["priority"] == "high"]
+    recent_mask = metric_timestamps > to_epoch_ns(recent_threshold)
+    recent_types = metric_types[recent_mask]
+    
+    # Per-metric-type sums and counts over the recent window, then every average from one table
+    type_sums = np.bincount(recent_types, weights=metric_values[recent_mask], minlength=len(METRIC_TYPES))
+    type_counts = np.bincount(recent_types, minlength=len(METRIC_TYPES))
+    type_averages = type_sums / np.maximum(type_counts, 1)
     
-    avg_cpu = sum([m["value"] for m in recent_metrics if m["metric_type"] == "cpu_usage"]) / max(len([m for m in recent_metrics if m["metric_type"] == "cpu_usage"]), 1)
-    avg_memory = sum([m["value"] for m in recent_metrics if m["metric_type"] == "memory_usage"]) / max(len([m for m in recent_metrics if m["metric_type"] == "memory_usage"]), 1)
+    avg_cpu = type_averages[metric_type_codes["cpu_usage"]]
+    avg_memory = type_averages[metric_type_codes["memory_usage"]]
     health_score = max(0, 100 - (avg_cpu + avg_memory) / 2)
     
     return {
-        "system_health_score": round(health_score, 1),
-        "total_users": len(set([m["user_id"] for m in monitoring_data])),
-        "active_alerts": len(unresolved_alerts),
-        "high_priority_prompts": len(high_priority_prompts),
-        "recent_metrics_count": len(recent_metrics),
+        "system_health_score": round(float(health_score), 1),
+        "total_users": len(KNOWN_USERS),
+        "active_alerts": sum(1 for a in alerts if not a["is_resolved"]),
+        "high_priority_prompts": sum(1 for p in self_service_prompts if p["priority"] == "high"),
+        "recent_metrics_count": len(recent_types),
         "productivity_trends": {
-            "focus_time_avg": round(sum([m["value"] for m in recent_metrics if m["metric_type"] == "focus_time"]) / max(len([m for m in recent_metrics if m["metric_type"] == "focus_time"]), 1), 1),
-            "task_completion_rate": round(sum([m["value"] for m in recent_metrics if m["metric_type"] == "task_completion_rate"]) / max(len([m for m in recent_metrics if m["metric_type"] == "task_completion_rate"]), 1), 1)
+            "focus_time_avg": round(float(type_averages[metric_type_codes["focus_time"]]), 1),
+            "task_completion_rate": round(float(type_averages[metric_type_codes["task_completion_rate"]]), 1)
         }
     }
@@ -0,0 +1,10 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as client:
+        yield client
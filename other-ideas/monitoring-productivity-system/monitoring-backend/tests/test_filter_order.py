@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import pytest
+
+from app import main
+
+ALL = {"page_size": 1000}
+
+
+@pytest.fixture
+def tied_timestamps(monkeypatch):
+    # Every record shares one timestamp, so ordering among equal keys decides the pages
+    timestamp = datetime(2025, 1, 1)
+    for record in main.alerts + main.self_service_prompts:
+        monkeypatch.setitem(record, "timestamp", timestamp)
+
+
+def paged(client, path, key, params, page_size=2):
+    items, page = [], 1
+    while True:
+        body = client.get(path, params={**params, "page": page, "page_size": page_size}).json()
+        if not body[key]:
+            return items
+        items += body[key]
+        page += 1
+
+
+@pytest.mark.parametrize(
+    "params, matches",
+    [
+        ({"priority": "high"}, lambda p: p["priority"] == "high"),
+        ({"priority": "low"}, lambda p: p["priority"] == "low"),
+        ({"user_id": "alice"}, lambda p: p["user_id"] == "alice"),
+        ({"user_id": "bob", "priority": "medium"}, lambda p: p["user_id"] == "bob" and p["priority"] == "medium"),
+    ],
+)
+def test_filtered_prompts_keep_unfiltered_tie_order(client, tied_timestamps, params, matches):
+    unfiltered = client.get("/api/self-service-prompts", params=ALL).json()["prompts"]
+    expected = [p["id"] for p in unfiltered if matches(p)]
+
+    assert [p["id"] for p in paged(client, "/api/self-service-prompts", "prompts", params)] == expected
+
+
+@pytest.mark.parametrize(
+    "params, matches",
+    [
+        ({"severity": "high"}, lambda a: a["severity"] == "high"),
+        ({"resolved": False}, lambda a: not a["is_resolved"]),
+        ({"user_id": "alice"}, lambda a: a["user_id"] == "alice"),
+        ({"user_id": "bob", "severity": "medium"}, lambda a: a["user_id"] == "bob" and a["severity"] == "medium"),
+    ],
+)
+def test_filtered_alerts_keep_unfiltered_tie_order(client, tied_timestamps, params, matches):
+    unfiltered = client.get("/api/alerts", params=ALL).json()["alerts"]
+    expected = [a["id"] for a in unfiltered if matches(a)]
+
+    assert [a["id"] for a in paged(client, "/api/alerts", "alerts", params)] == expected
@@ -0,0 +1,19 @@
+from app import main
+
+
+PROMPT_FIELDS = {"id", "user_id", "prompt_type", "title", "description", "actions", "priority", "timestamp"}
+
+
+def test_prompts_expose_only_public_fields(client):
+    prompts = client.get("/api/self-service-prompts", params={"page_size": 1000}).json()["prompts"]
+
+    assert set(main.SelfServicePrompt.model_fields) == PROMPT_FIELDS
+    assert prompts
+    assert all(set(prompt) == PROMPT_FIELDS for prompt in prompts)
+
+
+def test_prompts_order_by_priority_then_newest(client):
+    prompts = client.get("/api/self-service-prompts", params={"page_size": 1000}).json()["prompts"]
+
+    keys = [(main.PRIORITY_RANK[p["priority"]], p["timestamp"]) for p in prompts]
+    assert keys == sorted(keys, reverse=True)
@@ -1,12 +1,146 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Path
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
+from contextlib import asynccontextmanager
+from aiosqlitepool import SQLiteConnectionPool
+import aiosqlite
+import asyncio
+import orjson
+import os
+import secrets
 import uuid
-from datetime import datetime
-import json
+from datetime import datetime, timezone
 
-app = FastAPI(title="SAIL Summit Registration API", version="1.0.0")
+DATABASE_PATH = os.environ.get("DATABASE_PATH", "sail_summit.db")
+REGISTRATION_STREAM_CHUNK_ROWS = 256
+PAYMENT_INTENT_ID_PATTERN = r"^pi_[0-9a-f]{24}$"
+REGISTRATION_ID_PATTERN = r"^[0-9a-f\-]{36}$"
+REGISTRATION_MAX_BATCH_SIZE = 64
+REGISTRATION_MAX_DELAY_SECONDS = 0.005
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS payment_intents (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS registrations (
+    id TEXT PRIMARY KEY,
+    payment_intent_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_registrations_payment_intent_id ON registrations (payment_intent_id);
+"""
+
+pool: Optional[SQLiteConnectionPool] = None
+registration_queue: Optional[asyncio.Queue] = None
+
+async def sqlite_connection():
+    conn = await aiosqlite.connect(DATABASE_PATH)
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+async def collect_registration_batch(queue: asyncio.Queue, max_batch_size: int, max_delay: float) -> list:
+    """Wait for one registration, then gather more until the batch is full, max_delay has passed or shutdown is signalled"""
+    batch = [await queue.get()]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_delay
+    
+    while len(batch) < max_batch_size and batch[-1] is not None:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    
+    return batch
+
+async def write_registrations(batch: list):
+    """Claim each payment intent and insert the registrations it won in one transaction, then resolve every waiter"""
+    claimed = {}
+    
+    async with pool.connection() as conn:
+        try:
+            for registration, future in batch:
+                # Only one confirm can move an intent to succeeded; a racing confirm
+                # in this batch or another process finds it already claimed
+                cursor = await conn.execute(
+                    "UPDATE payment_intents SET status = 'succeeded' WHERE id = ? AND status != 'succeeded'",
+                    (registration["paymentIntentId"],)
+                )
+                if cursor.rowcount:
+                    claimed[registration["paymentIntentId"]] = registration
+            
+            await conn.executemany(
+                "INSERT INTO registrations (id, payment_intent_id, data) VALUES (?, ?, ?)",
+                [(registration["id"], payment_intent_id, orjson.dumps(registration).decode())
+                 for payment_intent_id, registration in claimed.items()]
+            )
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
+        
+        for registration, future in batch:
+            if future.done():
+                continue
+            if claimed.get(registration["paymentIntentId"]) is registration:
+                response = {
+                    "registration_id": registration["id"],
+                    "message": "Registration confirmed successfully",
+                    "registration": registration
+                }
+            else:
+                response = await confirmed_registration(conn, registration["paymentIntentId"])
+            if not future.done():
+                future.set_result(response)
+
+async def flush_registrations(queue: asyncio.Queue):
+    """Write queued registrations in batches until a None sentinel is received.
+    
+    A batch that fails, including failing to get a pool connection, fails only its
+    own waiters; the flusher keeps running for the batches after it.
+    """
+    while True:
+        batch = await collect_registration_batch(queue, REGISTRATION_MAX_BATCH_SIZE, REGISTRATION_MAX_DELAY_SECONDS)
+        shutting_down = batch[-1] is None
+        if shutting_down:
+            batch.pop()
+        
+        if batch:
+            try:
+                await write_registrations(batch)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+        
+        if shutting_down:
+            return
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global pool, registration_queue
+    
+    pool = SQLiteConnectionPool(sqlite_connection)
+    async with pool.connection() as conn:
+        await conn.executescript(SCHEMA)
+        await conn.commit()
+    
+    registration_queue = asyncio.Queue()
+    flusher = asyncio.create_task(flush_registrations(registration_queue))
+    yield
+    
+    await registration_queue.put(None)
+    await flusher
+    await pool.close()
+
+app = FastAPI(title="SAIL Summit Registration API", version="1.0.0", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Disable CORS. Do not remove this for full-stack development.
 app.add_middleware(
@@ -17,9 +151,6 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-registrations_db = []
-payment_intents_db = []
-
 class RegistrationRequest(BaseModel):
     firstName: str
     lastName: str
@@ -39,23 +170,15 @@ class PaymentIntentRequest(BaseModel):
     currency: str = "usd"
     registration_data: RegistrationRequest
 
-class Registration(BaseModel):
-    id: str
-    firstName: str
-    lastName: str
-    email: str
-    phone: Optional[str]
-    organization: str
-    jobTitle: str
-    industry: str
-    attendanceType: str
-    dietaryRestrictions: Optional[str]
-    accessibility: Optional[str]
-    marketingConsent: bool
-    termsAccepted: bool
-    registrationDate: datetime
-    paymentStatus: str = "pending"
-    paymentIntentId: Optional[str] = None
+async def fetch_payment_intent(conn, payment_intent_id: str) -> Optional[dict]:
+    async with conn.execute("SELECT status, data FROM payment_intents WHERE id = ?", (payment_intent_id,)) as cursor:
+        row = await cursor.fetchone()
+    if not row:
+        return None
+    
+    payment_intent = orjson.loads(row[1])
+    payment_intent["status"] = row[0]
+    return payment_intent
 
 @app.get("/healthz")
 async def healthz():
@@ -64,111 +187,126 @@ async def healthz():
 @app.post("/api/create-payment-intent")
 async def create_payment_intent(request: PaymentIntentRequest):
     """Create a payment intent for the registration fee"""
-    try:
-        payment_intent_id = f"pi_{uuid.uuid4().hex[:24]}"
-        client_secret = f"{payment_intent_id}_secret_{uuid.uuid4().hex[:16]}"
-        
-        payment_intent = {
-            "id": payment_intent_id,
-            "client_secret": client_secret,
-            "amount": request.amount,
-            "currency": request.currency,
-            "status": "requires_payment_method",
-            "registration_data": request.registration_data.dict(),
-            "created_at": datetime.now()
-        }
-        payment_intents_db.append(payment_intent)
-        
-        return {
-            "client_secret": client_secret,
-            "payment_intent_id": payment_intent_id
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create payment intent: {str(e)}")
-
-@app.post("/api/confirm-registration")
-async def confirm_registration(payment_intent_id: str):
-    """Confirm registration after successful payment"""
-    try:
-        payment_intent = None
-        for pi in payment_intents_db:
-            if pi["id"] == payment_intent_id:
-                payment_intent = pi
-                break
-        
-        if not payment_intent:
-            raise HTTPException(status_code=404, detail="Payment intent not found")
-        
-        registration_id = str(uuid.uuid4())
-        registration_data = payment_intent["registration_data"]
-        
-        registration = Registration(
-            id=registration_id,
-            firstName=registration_data["firstName"],
-            lastName=registration_data["lastName"],
-            email=registration_data["email"],
-            phone=registration_data.get("phone"),
-            organization=registration_data["organization"],
-            jobTitle=registration_data["jobTitle"],
-            industry=registration_data["industry"],
-            attendanceType=registration_data["attendanceType"],
-            dietaryRestrictions=registration_data.get("dietaryRestrictions"),
-            accessibility=registration_data.get("accessibility"),
-            marketingConsent=registration_data["marketingConsent"],
-            termsAccepted=registration_data["termsAccepted"],
-            registrationDate=datetime.now(),
-            paymentStatus="completed",
-            paymentIntentId=payment_intent_id
+    payment_intent_id = f"pi_{secrets.token_hex(12)}"
+    client_secret = f"{payment_intent_id}_secret_{secrets.token_hex(8)}"
+    
+    payment_intent = {
+        "id": payment_intent_id,
+        "client_secret": client_secret,
+        "amount": request.amount,
+        "currency": request.currency,
+        "status": "requires_payment_method",
+        # Already validated by FastAPI; pydantic's compiled serializer writes the JSON
+        # directly and orjson splices it in, skipping the intermediate dict
+        "registration_data": orjson.Fragment(request.registration_data.model_dump_json()),
+        "created_at": datetime.now(timezone.utc)
+    }
+    async with pool.connection() as conn:
+        await conn.execute(
+            "INSERT INTO payment_intents (id, status, data) VALUES (?, ?, ?)",
+            (payment_intent_id, payment_intent["status"], orjson.dumps(payment_intent).decode())
         )
-        
-        registrations_db.append(registration.dict())
-        
-        payment_intent["status"] = "succeeded"
-        
-        return {
-            "registration_id": registration_id,
-            "message": "Registration confirmed successfully",
-            "registration": registration
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to confirm registration: {str(e)}")
+        await conn.commit()
+    
+    return {
+        "client_secret": client_secret,
+        "payment_intent_id": payment_intent_id
+    }
+
+async def confirmed_registration(conn, payment_intent_id: str) -> dict:
+    """Return the registration already recorded for a succeeded payment intent"""
+    async with conn.execute("SELECT id, data FROM registrations WHERE payment_intent_id = ?", (payment_intent_id,)) as cursor:
+        row = await cursor.fetchone()
+    
+    return {
+        "registration_id": row[0],
+        "message": "Registration already confirmed",
+        "registration": orjson.loads(row[1])
+    }
+
+async def complete_registration(payment_intent: dict) -> dict:
+    """Record the registration for a paid payment intent and mark the intent succeeded.
+    
+    Confirming an intent that already succeeded returns its existing registration,
+    so repeated or concurrent confirms never register twice. New registrations are
+    queued for the batch writer, and the call returns once its batch is committed.
+    """
+    if payment_intent["status"] == "succeeded":
+        async with pool.connection() as conn:
+            return await confirmed_registration(conn, payment_intent["id"])
+    
+    # registration_data was validated as a RegistrationRequest on create, so the
+    # stored record is assembled directly rather than validated again
+    registration = {
+        "id": str(uuid.uuid4()),
+        **payment_intent["registration_data"],
+        "registrationDate": datetime.now(timezone.utc),
+        "paymentStatus": "completed",
+        "paymentIntentId": payment_intent["id"]
+    }
+    
+    future = asyncio.get_running_loop().create_future()
+    await registration_queue.put((registration, future))
+    return await future
+
+@app.post("/api/confirm-registration/{payment_intent_id}", response_model=None)
+async def confirm_registration(payment_intent_id: str = Path(pattern=PAYMENT_INTENT_ID_PATTERN)):
+    """Confirm registration after successful payment"""
+    async with pool.connection() as conn:
+        payment_intent = await fetch_payment_intent(conn, payment_intent_id)
+    if not payment_intent:
+        raise HTTPException(status_code=404, detail="Payment intent not found")
+    
+    return ORJSONResponse(await complete_registration(payment_intent))
 
 @app.get("/api/registrations")
 async def get_registrations():
     """Get all registrations (for admin purposes)"""
-    return {
-        "total": len(registrations_db),
-        "registrations": registrations_db
-    }
+    return StreamingResponse(stream_registrations(), media_type="application/json")
+
+async def stream_registrations():
+    """Stream the stored registration JSON as one array, a page at a time, counting rows for the trailing total.
+    
+    Each page is read on its own pooled connection, keyed on rowid, so a slow client
+    never holds a connection while the response drains.
+    """
+    total = 0
+    last_rowid = 0
+    yield b'{"registrations":['
+    
+    while True:
+        async with pool.connection() as conn:
+            async with conn.execute(
+                "SELECT rowid, data FROM registrations WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last_rowid, REGISTRATION_STREAM_CHUNK_ROWS)
+            ) as cursor:
+                rows = await cursor.fetchall()
+        if not rows:
+            break
+        
+        last_rowid = rows[-1][0]
+        yield (b"," if total else b"") + ",".join(row[1] for row in rows).encode()
+        total += len(rows)
+    
+    yield b'],"total":%d}' % total
 
 @app.get("/api/registration/{registration_id}")
-async def get_registration(registration_id: str):
+async def get_registration(registration_id: str = Path(pattern=REGISTRATION_ID_PATTERN)):
     """Get a specific registration by ID"""
-    for registration in registrations_db:
-        if registration["id"] == registration_id:
-            return registration
-    raise HTTPException(status_code=404, detail="Registration not found")
+    async with pool.connection() as conn:
+        async with conn.execute("SELECT data FROM registrations WHERE id = ?", (registration_id,)) as cursor:
+            row = await cursor.fetchone()
+    
+    if not row:
+        raise HTTPException(status_code=404, detail="Registration not found")
+    return Response(content=row[0], media_type="application/json")
 
-@app.post("/api/simulate-payment/{payment_intent_id}")
-async def simulate_payment(payment_intent_id: str):
+@app.post("/api/simulate-payment/{payment_intent_id}", response_model=None)
+async def simulate_payment(payment_intent_id: str = Path(pattern=PAYMENT_INTENT_ID_PATTERN)):
     """Simulate successful payment for demo purposes"""
-    try:
-        payment_intent = None
-        for pi in payment_intents_db:
-            if pi["id"] == payment_intent_id:
-                payment_intent = pi
-                break
-        
-        if not payment_intent:
-            raise HTTPException(status_code=404, detail="Payment intent not found")
-        
-        payment_intent["status"] = "succeeded"
-        
-        result = await confirm_registration(payment_intent_id)
-        
-        return {
-            "message": "Payment simulated successfully",
-            "registration": result
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to simulate payment: {str(e)}")
+    async with pool.connection() as conn:
+        payment_intent = await fetch_payment_intent(conn, payment_intent_id)
+    if not payment_intent:
+        raise HTTPException(status_code=404, detail="Payment intent not found")
+    
+    return ORJSONResponse(await complete_registration(payment_intent))
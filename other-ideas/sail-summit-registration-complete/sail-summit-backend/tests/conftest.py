@@ -0,0 +1,11 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "DATABASE_PATH", str(tmp_path / "sail_summit.db"))
+    with TestClient(main.app) as client:
+        yield client
@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import main
+
+REGISTRATION = {
+    "firstName": "Ada",
+    "lastName": "Lovelace",
+    "email": "ada@example.com",
+    "organization": "Analytical Engines",
+    "jobTitle": "Engineer",
+    "industry": "Technology",
+    "attendanceType": "in-person",
+    "termsAccepted": True,
+}
+
+
+def create_payment_intent(client) -> str:
+    response = client.post("/api/create-payment-intent", json={"registration_data": REGISTRATION})
+    assert response.status_code == 200
+    return response.json()["payment_intent_id"]
+
+
+def registrations(client) -> dict:
+    response = client.get("/api/registrations")
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_confirm_records_registration(client):
+    payment_intent_id = create_payment_intent(client)
+
+    response = client.post(f"/api/confirm-registration/{payment_intent_id}")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["message"] == "Registration confirmed successfully"
+    assert body["registration"]["paymentIntentId"] == payment_intent_id
+    assert body["registration"]["paymentStatus"] == "completed"
+    assert body["registration"]["registrationDate"].endswith("+00:00")
+    assert client.get(f"/api/registration/{body['registration_id']}").json() == body["registration"]
+
+
+@pytest.mark.parametrize("path", ["/api/confirm-registration/{}", "/api/simulate-payment/{}"])
+def test_repeated_confirm_returns_existing_registration(client, path):
+    payment_intent_id = create_payment_intent(client)
+    first = client.post(path.format(payment_intent_id)).json()
+
+    second = client.post(path.format(payment_intent_id))
+
+    assert second.status_code == 200
+    assert second.json() == {**first, "message": "Registration already confirmed"}
+    assert registrations(client)["total"] == 1
+
+
+@pytest.mark.parametrize("batch_size", [1, 64])
+def test_concurrent_confirms_register_once(client, monkeypatch, batch_size):
+    # A batch size of 1 puts racing confirms in separate batches, 64 in the same one
+    monkeypatch.setattr(main, "REGISTRATION_MAX_BATCH_SIZE", batch_size)
+    payment_intent_ids = [create_payment_intent(client) for _ in range(3)]
+    paths = [
+        path.format(payment_intent_id)
+        for payment_intent_id in payment_intent_ids
+        for path in ["/api/confirm-registration/{}", "/api/simulate-payment/{}"] * 4
+    ]
+
+    with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+        responses = list(executor.map(client.post, paths))
+
+    assert all(response.status_code == 200 for response in responses)
+    registration_ids = {}
+    for path, response in zip(paths, responses):
+        registration_ids.setdefault(path.rsplit("/", 1)[1], set()).add(response.json()["registration_id"])
+    assert all(len(ids) == 1 for ids in registration_ids.values())
+
+    listed = registrations(client)
+    assert listed["total"] == len(payment_intent_ids)
+    assert sorted(r["paymentIntentId"] for r in listed["registrations"]) == sorted(payment_intent_ids)
+
+
+@pytest.mark.parametrize(
+    "method, path",
+    [
+        ("post", "/api/confirm-registration/pi_000000000000000000000000"),
+        ("post", "/api/simulate-payment/pi_000000000000000000000000"),
+        ("get", "/api/registration/00000000-0000-0000-0000-000000000000"),
+    ],
+)
+def test_unknown_ids_are_not_found(client, method, path):
+    assert getattr(client, method)(path).status_code == 404
+
+
+@pytest.mark.parametrize(
+    "method, path",
+    [
+        ("post", "/api/confirm-registration/pi_123"),
+        ("post", "/api/simulate-payment/not-an-intent"),
+        ("get", "/api/registration/not-a-registration"),
+    ],
+)
+def test_malformed_ids_are_rejected(client, method, path):
+    assert getattr(client, method)(path).status_code == 422
+
+
+def test_registrations_stream_lists_every_page(client, monkeypatch):
+    monkeypatch.setattr(main, "REGISTRATION_STREAM_CHUNK_ROWS", 2)
+    assert registrations(client) == {"registrations": [], "total": 0}
+
+    registration_ids = [
+        client.post(f"/api/simulate-payment/{create_payment_intent(client)}").json()["registration_id"]
+        for _ in range(5)
+    ]
+
+    response = client.get("/api/registrations")
+    assert response.headers["content-type"] == "application/json"
+    assert list(response.json()) == ["registrations", "total"]
+    assert response.json()["total"] == 5
+    assert [r["id"] for r in response.json()["registrations"]] == registration_ids